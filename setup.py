@@ -20,29 +20,33 @@ setup(name="cord19q",
       packages=find_packages(where="src/python/"),
       package_dir={"": "src/python/"},
       keywords="search embedding machine-learning nlp covid-19 medical scientific papers",
-      python_requires=">=3.6",
+      python_requires=">=3.7",
       entry_points={
           "console_scripts": [
               "cord19q = cord19q.shell:main",
           ],
       },
       install_requires=[
-          "faiss-gpu>=1.6.3",
           "fasttext>=0.9.2",
           "html2text>=2020.1.16",
           "mdv>=1.7.4",
           "networkx>=2.4",
           "nltk>=3.5",
           "numpy>=1.18.4",
-          "pymagnitude @ git+https://github.com/neuml/magnitude",
+          "pymagnitude-lite>=0.1.43",
           "PyYAML>=5.3",
           "regex>=2020.5.14",
           "scikit-learn>=0.22.2.post1",
           "scipy>=1.4.1",
-          "torch>=1.4.0",
+          "torch>=1.4.0,<3.0",
           "tqdm>=4.46.0",
-          "transformers>=2.11.0"
+          "transformers>=2.11.0,<5.0"
       ],
+      extras_require={
+          "cpu": ["faiss-cpu>=1.7.4,<2.0"],
+          "gpu": ["faiss-gpu>=1.6.3,<1.8"],
+          "onnx": ["onnxruntime>=1.8.0"]
+      },
       classifiers=[
           "License :: OSI Approved :: Apache Software License",
           "Operating System :: OS Independent",
@@ -0,0 +1,107 @@
+"""
+Convert module
+"""
+
+import inspect
+import os.path
+import sys
+import tempfile
+
+import torch
+
+from transformers import AutoModelForQuestionAnswering, AutoTokenizer
+
+from .models import Models
+
+class Convert(object):
+    """
+    Exports a question-answering model to ONNX.
+    """
+
+    @staticmethod
+    def export(path, output, quantize):
+        """
+        Exports a question-answering model to an ONNX file. Batch size and sequence length are exported
+        as dynamic axes.
+
+        Args:
+            path: path to qa model
+            output: output ONNX file path
+            quantize: if model should be quantized to int8 for CPU inference
+        """
+
+        model = AutoModelForQuestionAnswering.from_pretrained(path)
+        tokenizer = AutoTokenizer.from_pretrained(path)
+
+        # Export tuple outputs (start, end)
+        model.config.return_dict = False
+        model.eval()
+
+        # Sample inputs used to trace the model
+        inputs = dict(tokenizer.encode_plus("question", "context", add_special_tokens=True, return_attention_mask=True, return_tensors="pt"))
+
+        # Exported input names follow the order of the model forward arguments
+        names = [name for name in inspect.signature(model.forward).parameters if name in inputs]
+
+        # Batch and sequence dimensions are dynamic for all inputs and outputs
+        axes = {name: {0: "batch", 1: "sequence"} for name in names + ["start", "end"]}
+
+        if quantize:
+            # pylint: disable=C0415
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            # Export full precision model to a temporary file, then write a dynamically quantized model to output
+            with tempfile.TemporaryDirectory() as directory:
+                fp32 = Convert.trace(model, inputs, names, axes, os.path.join(directory, "model.onnx"))
+                quantize_dynamic(fp32, output, weight_type=QuantType.QInt8)
+        else:
+            Convert.trace(model, inputs, names, axes, output)
+
+    @staticmethod
+    def trace(model, inputs, names, axes, output):
+        """
+        Traces a model with sample inputs and writes it to an ONNX file.
+
+        Args:
+            model: qa model
+            inputs: sample inputs
+            names: input names
+            axes: dynamic axes
+            output: output ONNX file path
+
+        Returns:
+            output ONNX file path
+        """
+
+        torch.onnx.export(model, (inputs,), output, input_names=names, output_names=["start", "end"], dynamic_axes=axes,
+                          opset_version=11)
+
+        return output
+
+    @staticmethod
+    def run(path, output, quantize=False):
+        """
+        Exports a question-answering model to ONNX.
+
+        Args:
+            path: path to qa model, if None uses default model
+            output: output ONNX file path, if None uses default path
+            quantize: if model should be quantized to int8 for CPU inference
+        """
+
+        # Default model if not provided
+        if not path:
+            path = "NeuML/bert-small-cord19qa"
+
+        # Default output path. Pipelines load models stored at this path, quantized models are stored separately.
+        if not output:
+            output = Models.onnxPath(path, True, quantize)
+
+        print("Exporting %s to %s" % (path, output))
+        Convert.export(path, output, quantize)
+
+if __name__ == "__main__":
+    # Run export with params: model path, output path, quantize flag
+    Convert.run(sys.argv[1] if len(sys.argv) > 1 else None,
+                sys.argv[2] if len(sys.argv) > 2 else None,
+                sys.argv[3] == "quantize" if len(sys.argv) > 3 else False)
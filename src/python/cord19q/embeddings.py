@@ -83,6 +83,12 @@ class Embeddings(object):
         # Embedding scoring method - weighs each word in a sentence
         self.scoring = None
 
+        # GPU resources, set when the embeddings index is resident on a GPU
+        self.resources = None
+
+        # Pinned host memory buffer for GPU index queries
+        self.buffer = None
+
         # Word vector model
         self.vectors = self.loadVectors(self.config["path"]) if self.config else None
 
@@ -150,12 +156,15 @@ class Embeddings(object):
 
         # Create embeddings index. Inner product is equal to cosine similarity on normalized vectors.
         # pylint: disable=E1136
-        self.embeddings = faiss.index_factory(embeddings.shape[1], "IVF100,SQ8", faiss.METRIC_INNER_PRODUCT)
+        self.embeddings = faiss.index_factory(embeddings.shape[1], self.config.get("index", "IVF100,SQ8"), faiss.METRIC_INNER_PRODUCT)
 
         # Train on embeddings model
         self.embeddings.train(embeddings)
         self.embeddings.add_with_ids(embeddings, np.array(ids))
 
+        # Number of clusters to search
+        self.embeddings.nprobe = 6
+
     def buildLSA(self, embeddings, components):
         """
         Builds a LSA model. This model is used to remove the principal component within embeddings. This helps to
@@ -222,16 +231,8 @@ class Embeddings(object):
             embeddings vector
         """
 
-        # Generate weights for each vector using a scoring method
-        weights = self.scoring.weights(document) if self.scoring else None
-
-        # pylint: disable=E1133
-        if weights and [x for x in weights if x > 0]:
-            # Build weighted average embeddings vector. Create weights array os float32 to match embeddings precision.
-            embedding = np.average(self.lookup(document[1]), weights=np.array(weights, dtype=np.float32), axis=0)
-        else:
-            # If no weights, use mean
-            embedding = np.mean(self.lookup(document[1]), axis=0)
+        # Build weighted average embeddings vector
+        embedding = self.average(document)
 
         # Reduce the dimensionality of the embeddings. Scale the embeddings using this
         # model to reduce the noise of common but less relevant terms.
@@ -240,6 +241,50 @@ class Embeddings(object):
         # Normalize vector if embeddings index exists, normalization is skipped during index builds
         return self.normalize(embedding) if self.embeddings else embedding
 
+    def batchtransform(self, documents):
+        """
+        Transforms a list of documents into an embeddings matrix. Principal component removal and normalization
+        are applied once over the full matrix.
+
+        Args:
+            documents: list of (id, tokens, tags)
+
+        Returns:
+            embeddings matrix with one row per document
+        """
+
+        # Stack weighted average embeddings vectors into a single matrix
+        embeddings = np.array([self.average(document) for document in documents], dtype=np.float32)
+
+        # Remove principal components
+        embeddings = self.removePC(embeddings) if self.lsa else embeddings
+
+        # Normalize vectors if embeddings index exists, normalization is skipped during index builds
+        return self.normalize(embeddings) if self.embeddings else embeddings
+
+    def average(self, document):
+        """
+        Builds an embeddings vector by averaging the word vectors for each document token. Word vectors are
+        weighted using the scoring method, if available.
+
+        Args:
+            document: (id, tokens, tags)
+
+        Returns:
+            average embeddings vector
+        """
+
+        # Generate weights for each vector using a scoring method
+        weights = self.scoring.weights(document) if self.scoring else None
+
+        # pylint: disable=E1133
+        if weights and [x for x in weights if x > 0]:
+            # Build weighted average embeddings vector. Create weights array os float32 to match embeddings precision.
+            return np.average(self.lookup(document[1]), weights=np.array(weights, dtype=np.float32), axis=0)
+
+        # If no weights, use mean
+        return np.mean(self.lookup(document[1]), axis=0)
+
     def lookup(self, tokens):
         """
         Queries word vectors for given list of input tokens.
@@ -265,15 +310,90 @@ class Embeddings(object):
             list of topn matched (id, score)
         """
 
-        # Convert tokens to embedding vector
-        embedding = self.transform((None, tokens, None))
+        return self.batchsearch([tokens], limit)[0]
+
+    def batchsearch(self, queries, limit=3):
+        """
+        Finds documents in the vector model most similar to each of the input queries. All queries are run
+        through the embeddings index as a single batch.
+
+        Args:
+            queries: list of input tokens
+            limit: maximum results
+
+        Returns:
+            list of topn matched (id, score) per query
+        """
+
+        # Nothing to search
+        if not queries:
+            return []
+
+        # Convert each list of tokens to an embedding vector, stack into a single query matrix
+        embeddings = np.ascontiguousarray(self.batchtransform([(None, tokens, None) for tokens in queries]), dtype=np.float32)
+
+        # Stage queries in pinned host memory for GPU indexes, requires a CUDA enabled torch build
+        if self.resources:
+            embeddings = self.pinned(embeddings)
 
         # Search embeddings index
-        self.embeddings.nprobe = 6
-        results = self.embeddings.search(embedding.reshape(1, -1), limit)
+        scores, ids = self.embeddings.search(embeddings, limit)
+
+        # Map results to [[(id, score)]]
+        return [list(zip(ids[x].tolist(), scores[x].tolist())) for x in range(len(queries))]
+
+    def gpu(self):
+        """
+        Moves the embeddings index to GPU memory, if GPUs are available. The index stays resident on the GPU for all
+        subsequent searches. This method does nothing on CPU-only systems.
+
+        Returns:
+            True if the embeddings index is on a GPU, False otherwise
+        """
+
+        if not self.resources and hasattr(faiss, "StandardGpuResources") and faiss.get_num_gpus() > 0:
+            # Resources must live as long as the GPU index
+            self.resources = faiss.StandardGpuResources()
+
+            # Use cuVS backed GPU indexes when the faiss build supports it. cuVS supports IVF-Flat and IVF-PQ indexes.
+            options = faiss.GpuClonerOptions()
+            if hasattr(options, "use_cuvs"):
+                options.use_cuvs = isinstance(self.embeddings, (faiss.IndexIVFFlat, faiss.IndexIVFPQ))
 
-        # Map results to [(id, score)]
-        return list(zip(results[1][0].tolist(), (results[0][0]).tolist()))
+            self.embeddings = faiss.index_cpu_to_gpu(self.resources, 0, self.embeddings, options)
+
+        return self.resources is not None
+
+    def pinned(self, embeddings):
+        """
+        Copies an embeddings matrix into a reusable pinned (page-locked) host memory buffer. Copies from pinned
+        memory to the GPU use direct memory access instead of an intermediate pageable buffer.
+
+        Args:
+            embeddings: input embeddings matrix
+
+        Returns:
+            embeddings matrix backed by pinned memory, input embeddings if torch can't pin memory
+        """
+
+        # Only load torch when searching GPU indexes
+        # pylint: disable=C0415
+        import torch
+
+        # Pinned memory requires a CUDA enabled torch build
+        if not torch.cuda.is_available():
+            return embeddings
+
+        rows, dimensions = embeddings.shape
+
+        # Allocate buffer on first use, grow as needed
+        if self.buffer is None or self.buffer.shape[0] < rows or self.buffer.shape[1] != dimensions:
+            self.buffer = torch.empty((max(rows, 64), dimensions), dtype=torch.float32, pin_memory=True)
+
+        pinned = self.buffer[:rows].numpy()
+        pinned[:] = embeddings
+
+        return pinned
 
     def similarity(self, query, documents):
         """
@@ -288,7 +408,7 @@ class Embeddings(object):
         """
 
         query = self.transform((None, query, None)).reshape(1, -1)
-        documents = np.array([self.transform((None, tokens, None)) for tokens in documents])
+        documents = self.batchtransform([(None, tokens, None) for tokens in documents])
 
         # Dot product on normalized vectors is equal to cosine similarity
         return np.dot(query, documents.T)[0]
@@ -314,6 +434,12 @@ class Embeddings(object):
         # Sentence embeddings index
         self.embeddings = faiss.read_index("%s/embeddings" % path)
 
+        # Number of clusters to search
+        self.embeddings.nprobe = 6
+
+        # Keep embeddings index resident on GPU, if available
+        self.gpu()
+
         with open("%s/lsa" % path, "rb") as handle:
             self.lsa = pickle.load(handle)
 
@@ -337,8 +463,8 @@ class Embeddings(object):
             with open("%s/config" % path, "wb") as handle:
                 pickle.dump(self.config, handle, protocol=pickle.HIGHEST_PROTOCOL)
 
-            # Write sentence embeddings
-            faiss.write_index(self.embeddings, "%s/embeddings" % path)
+            # Write sentence embeddings, GPU indexes are copied back to the CPU first
+            faiss.write_index(faiss.index_gpu_to_cpu(self.embeddings) if self.resources else self.embeddings, "%s/embeddings" % path)
 
             with open("%s/lsa" % path, "wb") as handle:
                 pickle.dump(self.lsa, handle, protocol=pickle.HIGHEST_PROTOCOL)
@@ -23,7 +23,7 @@ class Extractor(object):
             embeddings: embeddings model
             cur: database cursor
             path: path to qa model
-            quantize: True if model should be quantized before inference, False otherwise.
+            quantize: True if model should be quantized before CPU inference, False otherwise.
         """
 
         # Embeddings model and open database cursor
@@ -33,6 +33,9 @@ class Extractor(object):
         # QA Pipeline
         self.pipeline = Pipeline(path, quantize)
 
+        # Long-lived inference thread for the QA model, used to run extraction in the background
+        self.executor = self.pipeline.executor
+
     def __call__(self, uid, queue):
         """
         Extracts answers to input questions for a document. This method runs queries against a single document,
@@ -47,6 +50,81 @@ class Extractor(object):
             extracted answers
         """
 
+        return self.bulk([(uid, queue)])[0]
+
+    def bulk(self, documents):
+        """
+        Extracts answers to input questions for a list of documents. Question-context pairs are built for each document
+        and all pairs are run through the question-answering model at once.
+
+        Args:
+            documents: list of (document id, input queue)
+
+        Returns:
+            list of extracted answers, one per document
+        """
+
+        # Run inference on the model inference thread
+        return self.executor.submit(self.extract, self.contexts(documents)).result()
+
+    def contexts(self, documents):
+        """
+        Builds question-context pairs for a list of documents.
+
+        Args:
+            documents: list of (document id, input queue)
+
+        Returns:
+            list of question-context pairs, one per document
+        """
+
+        return [self.pairs(uid, queue) for uid, queue in documents]
+
+    def extract(self, documents):
+        """
+        Runs question-context pairs for a list of documents through the question-answering model at once. This method
+        doesn't access the database and can be run on a separate thread.
+
+        Args:
+            documents: list of question-context pairs, one per document
+
+        Returns:
+            list of extracted answers, one per document
+        """
+
+        # Flatten question-context pairs across documents
+        names, questions, contexts, snippets = [], [], [], []
+        for pairs in documents:
+            for name, question, context, snippet in pairs:
+                names.append(name)
+                questions.append(question)
+                contexts.append(context)
+                snippets.append(snippet)
+
+        # Run qa pipeline
+        answers = self.answers(names, questions, contexts, snippets)
+
+        # Split answers by document
+        results, start = [], 0
+        for pairs in documents:
+            results.append(answers[start:start + len(pairs)])
+            start += len(pairs)
+
+        return results
+
+    def pairs(self, uid, queue):
+        """
+        Builds question-context pairs for a document. Each context is built from the top n document sections
+        that best match the query.
+
+        Args:
+            uid: document id
+            queue: input queue (name, query, question, snippet)
+
+        Returns:
+            list of (name, question, context, snippet)
+        """
+
         # Retrieve indexed document text for article
         self.cur.execute(Index.SECTION_QUERY + " AND article = ?", [uid])
 
@@ -60,7 +138,7 @@ class Extractor(object):
                     tokenlist.append(tokens)
 
         # Build question-context pairs
-        names, questions, contexts, snippets = [], [], [], []
+        pairs = []
         for name, query, question, snippet in queue:
             query = Tokenizer.tokenize(query)
             matches = []
@@ -73,13 +151,9 @@ class Extractor(object):
             topn = sorted(matches, key=lambda x: x[2], reverse=True)[:3]
             context = " ".join([text for _, text, _ in sorted(topn, key=lambda x: x[0])])
 
-            names.append(name)
-            questions.append(question)
-            contexts.append(context)
-            snippets.append(snippet)
+            pairs.append((name, question, context, snippet))
 
-        # Run qa pipeline and return answers
-        return self.answers(names, questions, contexts, snippets)
+        return pairs
 
     def answers(self, names, questions, contexts, snippets):
         """
@@ -76,7 +76,8 @@ class Index(object):
 
         embeddings = Embeddings({"path": vectors,
                                  "scoring": "bm25",
-                                 "pca": 3})
+                                 "pca": 3,
+                                 "index": "IVF100,SQ8"})
 
         # Build scoring index if scoring method provided
         if embeddings.config["scoring"]:
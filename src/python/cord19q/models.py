@@ -54,6 +54,23 @@ class Models(object):
 
         return path
 
+    @staticmethod
+    def onnxPath(name, create=False, quantize=False):
+        """
+        ONNX model path for name
+
+        Args:
+            name: model name or path
+            create: if directory should be created
+            quantize: if path is for an int8 quantized model
+
+        Returns:
+            path
+        """
+
+        # Name ONNX file using last path component
+        return os.path.join(Models.modelPath(create), "%s%s.onnx" % (os.path.basename(name.rstrip("/")), "-int8" if quantize else ""))
+
     @staticmethod
     def testPath(source, name):
         """
@@ -120,6 +137,11 @@ class Models(object):
         # Connect to database file
         db = sqlite3.connect(dbfile)
 
+        # Read tuning: 64MB page cache, in-memory temp storage and memory-mapped reads up to 256MB
+        db.execute("PRAGMA cache_size = -65536")
+        db.execute("PRAGMA temp_store = MEMORY")
+        db.execute("PRAGMA mmap_size = 268435456")
+
         return (embeddings, db)
 
     @staticmethod
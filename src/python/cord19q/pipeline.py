@@ -2,11 +2,26 @@
 Pipeline module
 """
 
+import os.path
+
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
 import regex as re
 import torch
 
-from transformers import AutoModelForQuestionAnswering, AutoTokenizer
+from transformers import AutoConfig, AutoModelForQuestionAnswering, AutoTokenizer
+
+from .models import Models
+
+# ONNX Runtime is optional
+try:
+    import onnxruntime
+except ImportError:
+    onnxruntime = None
+
+# Loaded models and their inference threads, shared across all pipelines in a process
+MODELS = {}
 
 class Pipeline(object):
     """
@@ -15,26 +30,113 @@ class Pipeline(object):
     Logic based on HuggingFace's transformers QuestionAnswering pipeline.
     """
 
-    def __init__(self, path, quantize):
+    # Padded sequence lengths for GPU inference
+    BUCKETS = [16, 32, 64, 128, 256, 512]
+
+    def __init__(self, path, quantize, batch=32):
         """
-        Loads a new pipeline model.
+        Loads a new pipeline model. Models are loaded once per process and reused by later pipelines.
+
+        Each model has a single inference thread that lives as long as the process. Compiled models keep per-thread
+        state (CUDA graphs), running all background inference through executor keeps that state valid across calls.
 
         Args:
             path: path to model
-            quantize: if model should be quantized
+            quantize: if model should be quantized for CPU inference
+            batch: max number of question-context pairs to run through the model at once
         """
 
-        self.model = AutoModelForQuestionAnswering.from_pretrained(path)
-        self.tokenizer = AutoTokenizer.from_pretrained(path)
+        if (path, quantize) not in MODELS:
+            MODELS[(path, quantize)] = self.load(path, quantize)
+
+        self.model, self.tokenizer, self.device, self.maxlength, self.executor = MODELS[(path, quantize)]
+        self.batch = batch
+
+    def load(self, path, quantize):
+        """
+        Loads a model and tokenizer and prepares the model for inference. An exported ONNX model is run with
+        ONNX Runtime when both are available, otherwise the PyTorch model is loaded.
+
+        Args:
+            path: path to model
+            quantize: if model should be quantized for CPU inference
+
+        Returns:
+            (model, tokenizer, device, max number of tokens the model can score, inference executor)
+        """
+
+        tokenizer = AutoTokenizer.from_pretrained(path)
+
+        # Max number of tokens the model can score
+        maxlength = AutoConfig.from_pretrained(path).max_position_embeddings
+
+        # Use exported ONNX model, if available
+        onnx = self.onnx(path, quantize)
+        if onnx:
+            onnx, providers = onnx
 
-        if quantize:
+            # ONNX Runtime manages device placement, inputs are passed as CPU arrays without fixed shape padding
+            return (onnxruntime.InferenceSession(onnx, providers=providers), tokenizer, torch.device("cpu"), maxlength,
+                    ThreadPoolExecutor(max_workers=1))
+
+        model = AutoModelForQuestionAnswering.from_pretrained(path)
+
+        # Inference only
+        model.eval()
+
+        # Run on GPU if available
+        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+
+        if device.type == "cuda":
+            # Half precision inference
+            model = model.half().to(device)
+
+            # Compile model when supported. Inputs are padded to fixed shapes to reuse compiled graphs across calls.
+            if hasattr(torch, "compile"):
+                model = torch.compile(model, mode="reduce-overhead")
+        elif quantize:
+            # Dynamic int8 quantization of linear layers for CPU inference
             # pylint: disable=E1101
-            self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+        return (model, tokenizer, device, maxlength, ThreadPoolExecutor(max_workers=1))
+
+    def onnx(self, path, quantize):
+        """
+        Finds an exported ONNX model to run with ONNX Runtime. Quantized (int8) models are only used when quantize is
+        set and inference runs on CPU, full precision models are used otherwise.
+
+        Args:
+            path: path to model
+            quantize: if model should be quantized for CPU inference
+
+        Returns:
+            (ONNX file path, execution providers) or None if ONNX Runtime or an exported model isn't available
+        """
+
+        if onnxruntime:
+            providers = [provider for provider in ["CUDAExecutionProvider", "CPUExecutionProvider"]
+                         if provider in onnxruntime.get_available_providers()]
+
+            # Quantized model, CPU inference only
+            onnx = Models.onnxPath(path, quantize=True)
+            if quantize and providers[0] == "CPUExecutionProvider" and os.path.isfile(onnx):
+                return (onnx, providers)
+
+            # Full precision model
+            onnx = Models.onnxPath(path)
+            if os.path.isfile(onnx):
+                return (onnx, providers)
+
+        return None
 
     def __call__(self, questions, contexts):
         """
         Runs a extractive question-answering model against each question-context pair, finding the best answers.
 
+        Question-context pairs are sorted by length and run through the model in batches. This groups similarly sized
+        inputs together, which limits the amount of padding per batch.
+
         Args:
             questions: list of questions
             contexts: list of contexts to pull answers from
@@ -43,52 +145,130 @@ class Pipeline(object):
             list of answers
         """
 
-        answers = []
+        # Encode question and context using model tokenizer
+        inputs = [self.tokenizer.encode_plus(question, contexts[x], add_special_tokens=True, return_attention_mask=True)
+                  for x, question in enumerate(questions)]
 
-        for x, question in enumerate(questions):
-            # Encode question and context using model tokenizer
-            inputs = self.tokenizer.encode_plus(question, contexts[x], add_special_tokens=True, return_tensors="pt")
-            input_ids = inputs["input_ids"].tolist()[0]
+        # Default to no answer. Inputs longer than the max model length are not scored.
+        answers = [{"answer": None, "score": 0.0} for _ in inputs]
+        indices = sorted([x for x, encoded in enumerate(inputs) if len(encoded["input_ids"]) <= self.maxlength],
+                         key=lambda x: len(inputs[x]["input_ids"]))
 
-            try:
-                # Run the input against the model, get candidate start-end pairs
-                start, end = self.model(**inputs)
-                start, end = start.detach().numpy(), end.detach().numpy()
+        for x in range(0, len(indices), self.batch):
+            batch = indices[x:x + self.batch]
 
-                # Normalize start and end logits
-                start = np.exp(start) / np.sum(np.exp(start))
-                end = np.exp(end) / np.sum(np.exp(end))
+            # Run the batch against the model, get candidate start-end pairs
+            start, end = self.inference([inputs[y] for y in batch])
 
-                # Tokenized questions for BERT models take the format:
-                # [CLS] Question [SEP] Answer [SEP]
-                # This logic prevents the answer coming from the question
-                separator = input_ids.index(self.tokenizer.sep_token_id)
-                pmask = np.array([1 if x <= separator else 0 for x in range(len(input_ids))])
+            for row, y in enumerate(batch):
+                # Remove padding
+                input_ids = inputs[y]["input_ids"]
+                length = len(input_ids)
 
-                # Mask the question tokens
-                start, end = (start * np.abs(np.array(pmask) - 1), end * np.abs(np.array(pmask) - 1))
+                answers[y] = self.answer(input_ids, start[row:row + 1, :length], end[row:row + 1, :length], contexts[y])
 
-                tokens, answer = [], None
+        return answers
 
-                start, end, score = self.score(start, end, 15)
+    def inference(self, inputs):
+        """
+        Runs a batch of encoded inputs through the model.
 
-                # Require best score to be at least 0.05
-                if score >= 0.05:
-                    # Get span tokens
-                    tokens = self.tokenizer.convert_ids_to_tokens(input_ids[start:(end + 1)], skip_special_tokens=True)
+        Args:
+            inputs: list of encoded inputs
 
-                    # Build regex to match original string
-                    answer = re.search(self.regex(tokens), contexts[x], re.IGNORECASE)
-                    answer = answer[0]
+        Returns:
+            (start logits, end logits)
+        """
 
-                # Add answer
-                answers.append({"answer": answer, "score": score})
+        arrays = self.pad(inputs)
 
-            # pylint: disable=W0702
-            except:
-                answers.append({"answer": None, "score": 0.0})
+        # ONNX Runtime model
+        if onnxruntime and isinstance(self.model, onnxruntime.InferenceSession):
+            start, end = self.model.run(None, {x.name: arrays[x.name] for x in self.model.get_inputs()})[:2]
+            return start, end
 
-        return answers
+        # PyTorch model
+        with torch.no_grad():
+            outputs = self.model(**{name: torch.from_numpy(array).to(self.device) for name, array in arrays.items()})
+            return outputs[0].float().cpu().numpy(), outputs[1].float().cpu().numpy()
+
+    def pad(self, inputs):
+        """
+        Pads a batch of encoded inputs to the same length.
+
+        Args:
+            inputs: list of encoded inputs
+
+        Returns:
+            {name: array}
+        """
+
+        rows, length = len(inputs), max([len(encoded["input_ids"]) for encoded in inputs])
+
+        # Pad GPU batches to fixed shapes: full batch size and the smallest bucket that fits the longest input
+        if self.device.type == "cuda":
+            rows = self.batch
+            length = min([bucket for bucket in Pipeline.BUCKETS if bucket >= length] + [self.maxlength])
+
+        arrays = {}
+        for name in inputs[0].keys():
+            # Pad token ids with the pad token, all other inputs with 0
+            pad = self.tokenizer.pad_token_id if name == "input_ids" else 0
+
+            array = np.full((rows, length), pad, dtype=np.int64)
+            for x, encoded in enumerate(inputs):
+                array[x, :len(encoded[name])] = encoded[name]
+
+            arrays[name] = array
+
+        return arrays
+
+    def answer(self, input_ids, start, end, context):
+        """
+        Finds the best answer span for a question-context pair.
+
+        Args:
+            input_ids: encoded question-context tokens
+            start: start logits
+            end: end logits
+            context: context to pull answer from
+
+        Returns:
+            answer
+        """
+
+        try:
+            # Normalize start and end logits
+            start = np.exp(start) / np.sum(np.exp(start))
+            end = np.exp(end) / np.sum(np.exp(end))
+
+            # Tokenized questions for BERT models take the format:
+            # [CLS] Question [SEP] Answer [SEP]
+            # This logic prevents the answer coming from the question
+            separator = input_ids.index(self.tokenizer.sep_token_id)
+            pmask = np.array([1 if x <= separator else 0 for x in range(len(input_ids))])
+
+            # Mask the question tokens
+            start, end = (start * np.abs(np.array(pmask) - 1), end * np.abs(np.array(pmask) - 1))
+
+            tokens, answer = [], None
+
+            start, end, score = self.score(start, end, 15)
+
+            # Require best score to be at least 0.05
+            if score >= 0.05:
+                # Get span tokens
+                tokens = self.tokenizer.convert_ids_to_tokens(input_ids[start:(end + 1)], skip_special_tokens=True)
+
+                # Build regex to match original string
+                answer = re.search(self.regex(tokens), context, re.IGNORECASE)
+                answer = answer[0]
+
+            return {"answer": answer, "score": score}
+
+        # pylint: disable=W0702
+        except:
+            return {"answer": None, "score": 0.0}
 
     def score(self, start, end, maxlength):
         """
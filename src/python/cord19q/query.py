@@ -3,6 +3,7 @@ Query module
 """
 
 import datetime
+import heapq
 import re
 import sys
 
@@ -97,81 +98,86 @@ class Query(object):
             search results
         """
 
-        results = []
-
-        # Get list of required tokens
-        must = [token.strip("+") for token in query.split() if token.startswith("+")]
-
-        # Tokenize search query
-        query = Tokenizer.tokenize(query)
-
-        # Retrieve topn * 5 to account for duplicate matches
-        for uid, score in embeddings.search(query, topn * 5):
-            if score >= 0.6:
-                cur.execute("SELECT Article, Text FROM sections WHERE id = ?", [uid])
-
-                # Get matching row
-                sid, text = cur.fetchone()
-
-                # Add result if all required tokens are present or there are not required tokens
-                if not must or all([token.lower() in text.lower() for token in must]):
-                    # Save result
-                    results.append((uid, score, sid, text))
-
-        return results
+        return Query.batchsearch(embeddings, cur, [query], topn)[0]
 
     @staticmethod
-    def highlights(results, topn):
+    def batchsearch(embeddings, cur, queries, topn):
         """
-        Builds a list of highlights for the search results. Returns top ranked sections by importance
-        over the result list.
+        Executes an embeddings search for a list of queries. All queries are submitted to the embeddings index
+        as a single batch. Each returned result is resolved to the full section row.
 
         Args:
-            results: search results
-            topn: number of highlights to extract
+            embeddings: embeddings model
+            cur: database cursor
+            queries: list of query text
+            topn: number of documents to return per query
 
         Returns:
-            top ranked sections
+            list of search results, one per query
         """
 
-        sections = {}
-        for uid, score, _, text in results:
-            # Filter out lower scored results
-            if score >= 0.35:
-                sections[text] = (uid, text)
+        # Retrieve topn * 5 to account for duplicate matches
+        matches = embeddings.batchsearch([Tokenizer.tokenize(query) for query in queries], topn * 5)
 
-        # Return up to 5 highlights
-        return Highlights.build(sections.values(), min(topn, 5))
+        results = []
+        for x, query in enumerate(queries):
+            # Get list of required tokens
+            must = [token.strip("+") for token in query.split() if token.startswith("+")]
+
+            result = []
+            for uid, score in matches[x]:
+                if score >= 0.6:
+                    cur.execute("SELECT Article, Text FROM sections WHERE id = ?", [uid])
+
+                    # Get matching row
+                    sid, text = cur.fetchone()
+
+                    # Add result if all required tokens are present or there are not required tokens
+                    if not must or all([token.lower() in text.lower() for token in must]):
+                        # Save result
+                        result.append((uid, score, sid, text))
+
+            results.append(result)
+
+        return results
 
     @staticmethod
-    def documents(results, topn):
+    def summarize(results, highlights, topn):
         """
-        Processes search results and groups by article.
+        Builds highlights and groups search results by article using a single pass over the search results.
+        Highlights are the top ranked sections by importance over the result list.
 
         Args:
             results: search results
+            highlights: number of highlights to extract
             topn: number of documents to return
 
         Returns:
-            results grouped by article
+            (top ranked sections, results grouped by article)
         """
 
-        documents = {}
+        sections, documents = {}, {}
 
-        # Group by article
-        for _, score, article, text in results:
+        for uid, score, article, text in results:
+            # Filter out lower scored results for highlights
+            if score >= 0.35:
+                sections[text] = (uid, text)
+
+            # Group by article
             if article not in documents:
                 documents[article] = set()
 
             documents[article].add((score, text))
 
-        # Sort based on section id, which preserves original order
+        # Sort sections by score descending
         for uid in documents:
             documents[uid] = sorted(list(documents[uid]), reverse=True)
 
-        # Get documents with top n best sections
-        topn = sorted(documents, key=lambda k: max([x[0] for x in documents[k]]), reverse=True)[:topn]
-        return {uid: documents[uid] for uid in topn}
+        # Get documents with top n best sections, first section has the best score
+        topn = heapq.nlargest(topn, documents, key=lambda k: documents[k][0][0])
+
+        # Return up to 5 highlights
+        return Highlights.build(sections.values(), min(highlights, 5)), {uid: documents[uid] for uid in topn}
 
     @staticmethod
     def authors(authors):
@@ -209,7 +215,7 @@ class Query(object):
         """
 
         if date:
-            date = datetime.datetime.strptime(date, "%Y-%m-%d %H:%M:%S")
+            date = datetime.datetime.fromisoformat(date)
 
             # 1/1 dates had no month/day specified, use only year
             if date.month == 1 and date.day == 1:
@@ -303,16 +309,15 @@ class Query(object):
         # Query for best matches
         results = Query.search(embeddings, cur, query, topn)
 
-        # Extract top sections as highlights
+        # Extract top sections as highlights and get results grouped by document
+        highlights, documents = Query.summarize(results, int(topn / 5), topn)
+
         print(Query.render("# Highlights"))
-        for highlight in Query.highlights(results, int(topn / 5)):
+        for highlight in highlights:
             print(Query.render("## - %s" % Query.text(highlight)))
 
         print()
 
-        # Get results grouped by document
-        documents = Query.documents(results, topn)
-
         print(Query.render("# Articles") + "\n")
 
         # Print each result, sorted by max score descending
@@ -2,6 +2,8 @@
 Report module
 """
 
+import io
+
 from ..extractor import Extractor
 from ..query import Query
 
@@ -10,6 +12,13 @@ class Report(object):
     Methods to build reports from a series of queries
     """
 
+    # Max number of ids per database query
+    BATCH = 900
+
+    # Article metadata queries, first column must be the id
+    HIGHLIGHT_QUERY = "SELECT Id, Authors, Reference FROM articles"
+    ARTICLE_QUERY = "SELECT Id, Published, Title, Reference, Publication, Source, Design, Size, Sample, Method, Entry FROM articles"
+
     def __init__(self, embeddings, db):
         """
         Creates a new report.
@@ -26,8 +35,8 @@ class Report(object):
         # Column names
         self.names = []
 
-        # Extractive question-answering model
-        self.extractor = Extractor(self.embeddings, self.cur, "NeuML/bert-small-cord19qa", False)
+        # Extractive question-answering model, quantized when running on CPU
+        self.extractor = Extractor(self.embeddings, self.cur, "NeuML/bert-small-cord19qa", True)
 
     def build(self, queries, topn, output):
         """
@@ -42,110 +51,176 @@ class Report(object):
         # Default to 50 documents if not specified
         topn = topn if topn else 50
 
-        for name, config in queries:
-            query = config["query"]
-            columns = config["columns"]
+        # Number of highlights per query
+        count = int(topn / 10)
 
-            # Write query string
-            self.query(output, name, query)
+        # Query for best matches, all queries are run as a single batch
+        results = Query.batchsearch(self.embeddings, self.cur, [config["query"] for _, config in queries], topn)
 
-            # Write separator
-            self.separator(output)
+        # Answer extraction runs on the extractor inference thread, which overlaps model inference for a query with
+        # database lookups for the following queries. All database access stays on the calling thread.
+        reports = [self.prepare(self.extractor.executor, topn, count, (name, config["query"], config["columns"]), results[x])
+                   for x, (name, config) in enumerate(queries)]
 
-            # Query for best matches
-            results = Query.search(self.embeddings, self.cur, query, topn)
+        # Write reports in query order
+        for metadata, highlights, documents, articles, calculated in reports:
+            # Buffer report, written to output with a single call
+            buffer = io.StringIO()
+            self.render(buffer, metadata, highlights, documents, articles, calculated.result())
+            output.write(buffer.getvalue())
 
-            # Generate highlights section
-            self.section(output, "Highlights")
+    def prepare(self, executor, topn, count, metadata, results):
+        """
+        Prepares report data for a query. Database lookups and question-context pairs are run in the calling thread,
+        answer extraction is submitted to executor.
 
-            # Generate highlights
-            self.highlights(output, results, int(topn / 10))
+        Args:
+            executor: executor that runs answer extraction
+            topn: number of documents to return
+            count: number of highlights to return
+            metadata: query metadata
+            results: search results
 
-            # Separator between highlights and articles
-            self.separator(output)
+        Returns:
+            (metadata, highlights, documents, articles, calculated) with calculated as a future
+        """
+
+        # Extract top sections as highlights and get results grouped by document
+        sections, documents = Query.summarize(results, count, topn)
+        uids = list(documents.keys())
 
-            # Generate articles section
-            self.section(output, "Articles")
+        # Get matching article for each highlight
+        highlights = self.highlights(results, sections)
 
-            # Generate table headers
-            self.headers([column["name"] for column in columns], output)
+        # Get article metadata
+        articles = self.lookup(Report.ARTICLE_QUERY, uids)
 
-            # Generate table rows
-            self.articles(output, topn, (name, query, columns), results)
+        # Calculate derived fields
+        calculated = self.calculate(executor, uids, self.fields(metadata))
 
-            # Write section separator
-            self.separator(output)
+        return (metadata, highlights, documents, articles, calculated)
 
-    def highlights(self, output, results, topn):
+    def render(self, output, metadata, highlights, documents, articles, calculated):
         """
-        Builds a highlights section.
+        Writes the report for a single query.
 
         Args:
             output: output file
-            results: search results
-            topn: number of results to return
+            metadata: query metadata
+            highlights: list of (article, highlight)
+            documents: results grouped by article
+            articles: {uid: article}
+            calculated: {uid: {name: value}}
         """
 
-        # Extract top sections as highlights
-        for highlight in Query.highlights(results, topn):
-            # Get matching article
-            uid = [article for _, _, article, text in results if text == highlight][0]
-            self.cur.execute("SELECT Authors, Reference FROM articles WHERE id = ?", [uid])
-            article = self.cur.fetchone()
+        name, query, columns = metadata
 
-            # Write out highlight row
+        # Write query string
+        self.query(output, name, query)
+
+        # Write separator
+        self.separator(output)
+
+        # Generate highlights section
+        self.section(output, "Highlights")
+
+        # Write out highlight rows
+        for article, highlight in highlights:
             self.highlight(output, article, highlight)
 
-    def articles(self, output, topn, metadata, results):
+        # Separator between highlights and articles
+        self.separator(output)
+
+        # Generate articles section
+        self.section(output, "Articles")
+
+        # Generate table headers
+        self.headers([column["name"] for column in columns], output)
+
+        # Generate table rows
+        self.articles(output, documents, articles, calculated)
+
+        # Write section separator
+        self.separator(output)
+
+    def highlights(self, results, highlights):
         """
-        Builds an articles section.
+        Looks up the matching article for each highlight.
 
         Args:
-            output: output file
-            topn: number of documents to return
-            metadata: query metadata
             results: search results
+            highlights: top ranked sections
+
+        Returns:
+            list of (article, highlight)
         """
 
-        # Get results grouped by document
-        documents = Query.documents(results, topn)
+        # Map section text to article, first match wins
+        articles = {}
+        for _, _, article, text in results:
+            articles.setdefault(text, article)
 
-        # Collect matching rows
-        rows = []
+        # Get matching article for each highlight
+        uids = [articles[highlight] for highlight in highlights]
+        articles = self.lookup(Report.HIGHLIGHT_QUERY, uids)
 
-        for uid in documents:
-            # Get article metadata
-            self.cur.execute("SELECT Published, Title, Reference, Publication, Source, Design, Size, Sample, Method, Entry " +
-                             "FROM articles WHERE id = ?", [uid])
-            article = self.cur.fetchone()
+        return [(articles[uids[x]][1:], highlight) for x, highlight in enumerate(highlights)]
+
+    def articles(self, output, documents, articles, calculated):
+        """
+        Builds an articles section.
 
-            # Calculate derived fields
-            calculated = self.calculate(uid, metadata)
+        Args:
+            output: output file
+            documents: results grouped by article
+            articles: {uid: article}
+            calculated: {uid: {name: value}}
+        """
 
-            # Builds a row for article
-            rows.append(self.buildRow(article, documents[uid], calculated))
+        # Local references for row loop
+        buildRow, writeRow = self.buildRow, self.writeRow
 
         # Print report by published desc
-        for row in sorted(rows, key=lambda x: x["Date"], reverse=True):
-            # Convert row dict to list
-            row = [row[column] for column in self.names]
+        for uid in sorted(documents, key=lambda x: Query.date(articles[x][1]) or "", reverse=True):
+            # Build and write out row for article
+            writeRow(output, buildRow(articles[uid][1:], documents[uid], calculated[uid]))
 
-            # Write out row
-            self.writeRow(output, row)
+    def lookup(self, query, uids):
+        """
+        Runs a query for a list of ids. Ids are queried in batches to limit the number of round trips to the database.
+
+        Args:
+            query: select statement, first column must be the id
+            uids: list of ids
+
+        Returns:
+            {id: row}
+        """
+
+        rows = {}
+
+        # Query in batches, stays under the SQLite variable limit
+        for x in range(0, len(uids), Report.BATCH):
+            batch = uids[x:x + Report.BATCH]
+            self.cur.execute("%s WHERE id IN (%s)" % (query, ",".join(["?"] * len(batch))), batch)
 
-    def calculate(self, uid, metadata):
+            # Stream rows from cursor
+            rows.update((row[0], row) for row in self.cur)
+
+        return rows
+
+    def fields(self, metadata):
         """
-        Builds a dict of calculated fields for a given document.
+        Parses column definitions into calculated field definitions. Variable substitutions are applied once per query.
 
         Args:
-            uid: document id
             metadata: query metadata
 
         Returns:
-            {name: value} containing derived column values
+            (constants, questions) with constants as [(name, value)] and questions as [(name, query, question, snippet)]
         """
 
-        fields = {}
+        constants = []
         questions = []
 
         # Unpack metadata
@@ -154,7 +229,7 @@ class Report(object):
         for column in columns:
             # Constant column
             if "constant" in column:
-                fields[column["name"]] = column["constant"]
+                constants.append((column["name"], column["constant"]))
             # Question-answer column
             elif "query" in column:
                 # Query variable substitutions
@@ -164,11 +239,53 @@ class Report(object):
 
                 questions.append((column["name"], query, question, snippet))
 
+        return constants, questions
+
+    def calculate(self, executor, uids, fields):
+        """
+        Builds calculated fields for a list of documents. Question-context pairs are built in the calling thread and
+        answer extraction for all documents is submitted to executor as a single job.
+
+        Args:
+            executor: executor that runs answer extraction
+            uids: list of document ids
+            fields: (constants, questions) calculated field definitions
+
+        Returns:
+            future resolving to {uid: {name: value}} containing derived column values per document
+        """
+
+        constants, questions = fields
+
+        # Build question-context pairs
+        pairs = self.extractor.contexts([(uid, questions) for uid in uids])
+
+        return executor.submit(self.extract, uids, constants, pairs)
+
+    def extract(self, uids, constants, pairs):
+        """
+        Runs answer extraction and merges answers with constant fields.
+
+        Args:
+            uids: list of document ids
+            constants: [(name, value)] constant fields
+            pairs: question-context pairs per document
+
+        Returns:
+            {uid: {name: value}} containing derived column values per document
+        """
+
+        results = {}
+
         # Add extraction fields
-        for name, value in self.extractor(uid, questions):
-            fields[name] = value if value else ""
+        for x, answers in enumerate(self.extractor.extract(pairs)):
+            calculated = dict(constants)
+            for name, value in answers:
+                calculated[name] = value if value else ""
+
+            results[uids[x]] = calculated
 
-        return fields
+        return results
 
     def variables(self, value, metadata):
         """
@@ -247,6 +364,9 @@ class Report(object):
             article: article
             sections: text sections for article
             calculated: calculated fields
+
+        Returns:
+            list of column values ordered by column names
         """
 
     def writeRow(self, output, row):
@@ -22,6 +22,15 @@ class CSV(Report):
         self.csvout = None
         self.writer = None
 
+        # Output directory for query csv files
+        self.outdir = None
+
+    def build(self, queries, topn, output):
+        # Write query csv files to the same directory as the output file
+        self.outdir = os.path.dirname(output.name)
+
+        super(CSV, self).build(queries, topn, output)
+
     def cleanup(self, outfile):
         # Delete created master csv file
         os.remove(outfile)
@@ -31,7 +40,7 @@ class CSV(Report):
         if self.csvout:
             self.csvout.close()
 
-        self.csvout = open(os.path.join(os.path.dirname(output.name), "%s.csv" % task), "w")
+        self.csvout = open(os.path.join(self.outdir, "%s.csv" % task), "w")
         self.writer = csv.writer(self.csvout, delimiter=",", quotechar='"', quoting=csv.QUOTE_MINIMAL)
 
     def write(self, row):
@@ -87,7 +96,7 @@ class CSV(Report):
         # Merge in calculated fields
         columns.update(calculated)
 
-        return columns
+        return [columns[column] for column in self.names]
 
     def writeRow(self, output, row):
         self.write(row)
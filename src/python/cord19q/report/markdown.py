@@ -114,7 +114,7 @@ class Markdown(Report):
         columns.update(calculated)
 
         # Escape | characters embedded within columns
-        return {column: self.column(columns[column]) for column in columns}
+        return [self.column(columns[column]) for column in self.names]
 
     def writeRow(self, output, row):
         self.write(output, "|%s|" % "|".join(row))